@@ -1,5 +1,6 @@
 import re
 import json
+import xml.etree.ElementTree as ET
 import tiktoken
 from tqdm import tqdm
 from pathlib import Path
@@ -10,9 +11,12 @@ tokenizer = tiktoken.encoding_for_model('gpt-4o')
 all_docs_fp = Path.home() / r"Box\Fed-Register\all_doc_info.json"
 ALL_DATA = json.load(open(all_docs_fp, "r"))
 INPUT_DIR = Path.home() / r"Box\Fed-Register\Final-Rule-txts"
+XML_INPUT_DIR = Path.home() / r"Box\Fed-Register\Final-Rule-xmls"
 OUT_DIR = Path.home() / (r"Box\Fed-Register\Final-Rule-Batches-20241102")
 OUT_DIR.mkdir(exist_ok=True)
 
+LEGAL_REGEX = re.compile(r"\b\d{1,2}\sC?FR\s\d{1,5}(\([a-z]\d*\))*\s*(\(.+?\))?|\b\d{1,2}\sU\.S\.C\.\s\d{1,5}(\([a-zA-Z]\d*\))*|\b\d{1,2}\sU\.S\.C\.\s\d{1,5}(\([a-zA-Z]\d*\))*(\s*,\s*\d{1,2}\sU\.S\.C\.\s\d{1,5}(\([a-zA-Z]\d*\))*)*(\s*and\s*\d{1,2}\sU\.S\.C\.\s\d{1,5}(\([a-zA-Z]\d*\))*)?")
+
 PROMPT = """Extract academic references from the text below and return them using the json format below. 
 The json object should have the following keys: "citation", "title", "authors", "year", "journal", "publisher", "location", "volume", "pages", "doi", and "url". Where the citation key should contain the full citation of the paper.
 If there is not enough information to completely fill out the json, return as much as possible. If the author is "et. al." or not a person (e.g. "EPA"), flag the citation with "et_al_flag" or "non_person_author_flag" respectively.
@@ -41,7 +45,6 @@ Json format to be precisely followed:
 
 
 def extract_citations(text):
-    legal_regex = re.compile(r"\b\d{1,2}\sC?FR\s\d{1,5}(\([a-z]\d*\))*\s*(\(.+?\))?|\b\d{1,2}\sU\.S\.C\.\s\d{1,5}(\([a-zA-Z]\d*\))*|\b\d{1,2}\sU\.S\.C\.\s\d{1,5}(\([a-zA-Z]\d*\))*(\s*,\s*\d{1,2}\sU\.S\.C\.\s\d{1,5}(\([a-zA-Z]\d*\))*)*(\s*and\s*\d{1,2}\sU\.S\.C\.\s\d{1,5}(\([a-zA-Z]\d*\))*)?")
     sections = re.split(r"-{10,}", text)
     citations = ""
     for section in sections:
@@ -60,7 +63,10 @@ def extract_citations(text):
             citation_text = match[1].replace("\n", " ").strip()
             citations += citation_text + "\n"
             
-    citations = citations.splitlines()
+    return filter_citations(citations.splitlines())
+
+
+def filter_citations(citations):
     citations = [line.strip() for line in citations if line.strip()]
     citations = [line for line in citations if not (line.strip().lower().startswith("ibid."))]
     citations = [line for line in citations if not (line.strip().lower().startswith("id."))]
@@ -69,11 +75,42 @@ def extract_citations(text):
     citations = [line for line in citations if not (line.strip().lower().startswith("see supra"))]
     citations = [line for line in citations if not (line.strip().lower().startswith("supra"))]
     citations = [line for line in citations if not (line.strip().startswith("ISO"))]
-    citations = [line for line in citations if not (legal_regex.search(line.strip()))]
+    citations = [line for line in citations if not (LEGAL_REGEX.search(line.strip()))]
     citations = "\n".join(citations)
     return citations
 
 
+def extract_xml_citations(xml_file):
+    # Stream the document so only the current footnote is held in memory
+    citations = []
+    stack = []
+    ftnt_depth = 0
+    for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag == "FTNT":
+                ftnt_depth += 1
+            continue
+
+        stack.pop()
+        if elem.tag == "FTNT":
+            ftnt_depth -= 1
+            paragraphs = elem.findall(".//P") or [elem]
+            texts = [" ".join("".join(p.itertext()).split()) for p in paragraphs]
+            # Drop the footnote number held in the first paragraph's <SU>
+            su = paragraphs[0].find("SU")
+            if su is not None and su.text and texts[0].startswith(su.text.strip()):
+                texts[0] = texts[0][len(su.text.strip()):]
+            # One line per footnote, matching extract_citations
+            citations.append(" ".join(texts))
+
+        # Detach finished elements so the tree never grows past the current path
+        if ftnt_depth == 0 and stack:
+            stack[-1].remove(elem)
+
+    return filter_citations(citations)
+
+
 def chunk_text(prompt, text, max_tokens=2500):
     lines = []
     total_tokens = 0 
@@ -135,15 +172,34 @@ def main():
     file_paths = {}
     for year in tqdm(range(1990, 2025), desc="Finding files"):
         doc_ids = [item['document_number'] for item in ALL_DATA if int(item['publication_date'][:4]) == year]
-        file_paths[year] = set([INPUT_DIR / f"{doc_id}.txt" for doc_id in doc_ids if (INPUT_DIR / f"{doc_id}.txt").exists()])
+        # Prefer the full text XML where it has been downloaded, fall back to the raw text
+        file_paths[year] = set()
+        for doc_id in doc_ids:
+            if (XML_INPUT_DIR / f"{doc_id}.xml").exists():
+                file_paths[year].add(XML_INPUT_DIR / f"{doc_id}.xml")
+            elif (INPUT_DIR / f"{doc_id}.txt").exists():
+                file_paths[year].add(INPUT_DIR / f"{doc_id}.txt")
 
     
     yearly_batch_files = set()
     for year, files in file_paths.items():
         for file in tqdm(files, desc=f"Processing files for {year}"):
-            with open(file, "r", encoding="utf-8") as f:
-                text = f.read()
-            refs = extract_citations(text)
+            refs = None
+            if file.suffix == ".xml":
+                try:
+                    refs = extract_xml_citations(file)
+                except ET.ParseError:
+                    pass
+                # Untagged or truncated XML, try the raw text instead
+                if not refs:
+                    file = INPUT_DIR / f"{file.stem}.txt"
+                    if not file.exists():
+                        continue
+                    refs = None
+            if refs is None:
+                with open(file, "r", encoding="utf-8") as f:
+                    text = f.read()
+                refs = extract_citations(text)
             if not refs:
                 continue
             chunks, tok_count = chunk_text(PROMPT, refs)
@@ -101,7 +101,7 @@ def status_check(folder: Path, tot_count: int):
         time.sleep(60)
 
 
-def download_xml(session, doc, output_folder, event, lock: threading.Lock):
+def download_xml(session, doc, output_folder, event, lock: threading.Lock, ext="txt"):
     if not event.is_set():
         event.wait()
     with lock:
@@ -109,7 +109,7 @@ def download_xml(session, doc, output_folder, event, lock: threading.Lock):
 
     match response.status_code:
         case 200:
-            with open(f"{output_folder}/{doc.id}.txt", "wb") as file:
+            with open(f"{output_folder}/{doc.id}.{ext}", "wb") as file:
                 file.write(response.content)
             return True, doc
         case 429:
@@ -133,7 +133,7 @@ def download_xml(session, doc, output_folder, event, lock: threading.Lock):
             return True, doc
 
 
-def get_txt_files(info_file, output_folder, thread_count=16):
+def get_files(info_file, output_folder, url_field, ext, thread_count=16):
     print("Gathering resources...")
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
@@ -146,12 +146,12 @@ def get_txt_files(info_file, output_folder, thread_count=16):
     # Check if the files have already been downloaded or ar missing
     Doc = namedtuple("Doc", ["id", "url"])
     data = [
-        Doc(doc["document_number"], doc["raw_text_url"])
+        Doc(doc["document_number"], doc[url_field])
         for doc in data
         if (doc['type'] is not None)
         and (doc["type"].strip().lower() == "rule")
-        and (doc["raw_text_url"] is not None)
-        and (output_folder / f"{doc['document_number']}.txt").exists() == False
+        and (doc.get(url_field) is not None)
+        and (output_folder / f"{doc['document_number']}.{ext}").exists() == False
     ]
     
     
@@ -176,7 +176,7 @@ def get_txt_files(info_file, output_folder, thread_count=16):
             event.set()
             lock = threading.Lock()
             futures = [
-                executor.submit(download_xml, session, doc, output_folder, event, lock)
+                executor.submit(download_xml, session, doc, output_folder, event, lock, ext)
                 for doc in data
             ]
             for future in concurrent.futures.as_completed(futures):
@@ -194,20 +194,35 @@ def get_txt_files(info_file, output_folder, thread_count=16):
                     event.clear()
                     time.sleep(180)
                     event.set()
-                    executor.submit(download_xml, session, doc, event)
+                    executor.submit(download_xml, session, doc, output_folder, event, lock, ext)
                     with lock:
                         logging.info(f"Resuming download...")
 
 
+def get_txt_files(info_file, output_folder, thread_count=16):
+    get_files(info_file, output_folder, "raw_text_url", "txt", thread_count)
+
+
+def get_xml_files(info_file, output_folder, thread_count=16):
+    # Full text XML keeps footnotes as <FTNT> elements, see extract_xml_citations
+    get_files(info_file, output_folder, "full_text_xml_url", "xml", thread_count)
+
+
 if __name__ == "__main__":
     info_file = Path.home() / "box/fed-register/all_doc_info.json"
     output_folder = Path.home() / "box/fed-register/Final-Rule-txts"
+    xml_output_folder = Path.home() / "box/fed-register/Final-Rule-xmls"
 
     if not info_file.exists():
         print("Getting doc specifications...")
         get_all_documents(info_file)
 
-    if len(sys.argv) > 1:
-        get_txt_files(info_file, output_folder, int(sys.argv[1]))
+    # Pass --xml to download the full text XML instead of the raw text
+    use_xml = "--xml" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--xml"]
+    thread_count = int(args[0]) if args else 16
+
+    if use_xml:
+        get_xml_files(info_file, xml_output_folder, thread_count)
     else:
-        get_txt_files(info_file, output_folder)
+        get_txt_files(info_file, output_folder, thread_count)